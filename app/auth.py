@@ -1,4 +1,5 @@
 import hashlib
+import hmac
 import secrets
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
@@ -7,14 +8,22 @@ from app.logger import app_logger
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+_sha256 = hashlib.sha256
+
+def _password_digest(password: str) -> bytes:
+    return _sha256(password.encode(), usedforsecurity=True).digest()
+
 def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+    return _password_digest(password).hex()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    result = hash_password(plain_password) == hashed_password
-    if result:
-        app_logger.info("Password verification successful")
-    else:
+    try:
+        expected = bytes.fromhex(hashed_password)
+    except (TypeError, ValueError):
+        expected = b""
+    # Constant-time compare on the raw digests
+    result = hmac.compare_digest(_password_digest(plain_password), expected)
+    if not result:
         app_logger.warning("Password verification failed")
     return result
 
@@ -35,17 +44,73 @@ setup_initial_password() # Run on module load to ensure secure setup
 
 
 # Actual JWT implementation
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
+import jwt
+from jwt import PyJWTError
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 # 1 day
 
+# Recently verified tokens: sha256(token)[:16] -> (verified_at, payload)
+# The raw token is never stored. Entries are re-verified after TOKEN_CACHE_TTL.
+# Rejected tokens are kept as (verified_at, None, error) for the shorter
+# TOKEN_REJECT_TTL, so replaying a bad token doesn't cost a decode each time.
+TOKEN_CACHE_TTL = 30 # seconds
+TOKEN_REJECT_TTL = 5 # seconds
+TOKEN_CACHE_MAX = 10000
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+_signing_key = None
+
+def refresh_secret():
+    """Reloads the JWT key from config. Call after changing secret_key."""
+    global _signing_key
+    # Encoded once instead of on every encode/decode
+    _signing_key = config.get("secret_key").encode()
+    with _token_cache_lock:
+        _token_cache.clear()
+
+refresh_secret()
+
+def _decode_cached(token: str) -> dict:
+    """Decode and verify a JWT, reusing the result of a recent verification."""
+    # Only a lookup key, so the non-FIPS path is fine and 16 bytes suffice
+    key = _sha256(token.encode(), usedforsecurity=False).digest()[:16]
+    now = time.time()
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+    if entry is not None:
+        verified_at, payload = entry[0], entry[1]
+        if payload is None:
+            if now - verified_at < TOKEN_REJECT_TTL:
+                raise jwt.InvalidTokenError(entry[2])
+        # Still honour the token's own expiry on a cache hit
+        elif now - verified_at < TOKEN_CACHE_TTL and payload.get("exp", 0) > now:
+            return payload
+
+    try:
+        payload = jwt.decode(token, _signing_key, algorithms=[ALGORITHM])
+    except PyJWTError as e:
+        _cache_token(key, (now, None, str(e)))
+        raise
+    _cache_token(key, (now, payload))
+    return payload
+
+def _cache_token(key, entry):
+    with _token_cache_lock:
+        _token_cache[key] = entry
+        if len(_token_cache) > TOKEN_CACHE_MAX:
+            _token_cache.popitem(last=False)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, config.get("secret_key"), algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _signing_key, algorithm=ALGORITHM)
     app_logger.info(f"Access token created for user: {data.get('sub', 'unknown')}")
     return encoded_jwt
 
@@ -56,13 +121,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, config.get("secret_key"), algorithms=[ALGORITHM])
+        payload = _decode_cached(token)
         username: str = payload.get("sub")
         if username is None:
             app_logger.warning("Token validation failed: username not found in payload")
             raise credentials_exception
-        app_logger.debug(f"Token validated for user: {username}")
-    except JWTError as e:
+        app_logger.debug("Token validated for user: %s", username)
+    except PyJWTError as e:
         app_logger.warning(f"Token validation failed: {str(e)}")
         raise credentials_exception
     return username
@@ -72,10 +137,10 @@ async def get_current_active_user(current_user: str = Depends(get_current_user))
 
 def verify_token_str(token: str):
     try:
-        payload = jwt.decode(token, config.get("secret_key"), algorithms=[ALGORITHM])
+        payload = _decode_cached(token)
         username: str = payload.get("sub")
-        app_logger.debug(f"Token string verified for user: {username}")
+        app_logger.debug("Token string verified for user: %s", username)
         return username
-    except JWTError:
+    except PyJWTError:
         app_logger.debug("Token string verification failed")
         return None
@@ -1,12 +1,172 @@
-import tempfile
 import os
 import shutil
-import glob
+import tempfile
 import datetime
+import time
 import asyncio
+import threading
+import zipfile
+import zlib
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from app.config import config
 from app.logger import app_logger
 
+try:
+    import deflate # libdeflate bindings: faster raw deflate and crc32 than zlib
+except ImportError:
+    deflate = None
+
+try:
+    import fcntl
+    # Reflink ioctl from linux/fs.h; the fcntl module only names it from Python 3.12
+    FICLONE = getattr(fcntl, "FICLONE", 0x40049409)
+except ImportError:
+    FICLONE = None
+
+# Already compressed formats: deflating them again costs CPU for no size gain.
+# Region files (.mca/.mcc) hold zlib-compressed chunks, rotated server logs are .log.gz.
+STORED_EXTENSIONS = frozenset({
+    ".mca", ".mcc", ".zip", ".jar", ".png", ".jpg", ".jpeg", ".ogg", ".mp3",
+    ".gz", ".xz", ".7z",
+})
+
+COMPRESS_WORKERS = os.cpu_count() or 1
+MAX_PENDING = COMPRESS_WORKERS * 2 # Compressed batches waiting to be written
+MAX_PENDING_BYTES = 64 * 1024 * 1024 # ...holding at most this much file data, whatever the core count
+# Small files are compressed in batches so a world's thousands of tiny
+# .json/.dat files don't each pay for a pool round trip
+BATCH_MAX_FILES = 64
+BATCH_MAX_BYTES = 1024 * 1024
+MAX_BUFFERED_SIZE = 16 * 1024 * 1024 # Larger files are streamed, see _stream_file
+ZLIB_MAX_LEVEL = 9 # libdeflate goes up to 12
+STREAM_CHUNK_SIZE = 1024 * 1024
+# Directory listing is latency bound, not CPU bound, so oversubscribe
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+PROGRESS_INTERVAL = 0.25 # Seconds between status updates while archiving
+PROGRESS_LOG_INTERVAL = 5.0
+SNAPSHOT_PREFIX = ".backup_snapshot_" # Never archived, see BackupManager._snapshot
+
+# Backups get their own worker so they never occupy the default asyncio pool
+_BACKUP_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backup")
+
+@lru_cache(maxsize=4096)
+def _fmt_mtime(sec: int) -> str:
+    """ISO timestamp for a backup's mtime, at second resolution"""
+    return datetime.datetime.fromtimestamp(sec).isoformat()
+
+def _scan_dir(path, prefix_len, backup_prefix):
+    """Lists one directory for the parallel scan. Returns (files, subdirs), see _scan_files."""
+    files = []
+    subdirs = []
+    try:
+        it = os.scandir(path)
+    except OSError as e:
+        # Unreadable (a root-owned lost+found) or deleted since its parent was
+        # listed; skipped like os.walk does
+        app_logger.debug("Skipping directory %s: %s", path, e)
+        return files, subdirs
+    with it:
+        for entry in it:
+            # DirEntry caches the d_type, so no extra stat() per entry
+            if entry.is_dir(follow_symlinks=False):
+                if not ((entry.path + os.sep).startswith(backup_prefix)
+                        or entry.name.startswith(SNAPSHOT_PREFIX)):
+                    subdirs.append(entry.path)
+            elif entry.is_file():
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue # Deleted since the listing
+                files.append((entry.path, entry.path[prefix_len:], st))
+    return files, subdirs
+
+def _clone_file(src, dst):
+    """Reflink copy: dst shares src's extents copy-on-write (btrfs, xfs)"""
+    with open(src, 'rb') as fsrc, open(dst, 'xb') as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+def _make_zipinfo(arcname, st):
+    """Same as ZipInfo.from_file, but reuses the stat result from the scan"""
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(st.st_mtime)[:6])
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    zinfo.file_size = st.st_size
+    return zinfo
+
+def _crc32(data):
+    return deflate.crc32(data) if deflate is not None else zlib.crc32(data)
+
+def _deflate(data, level):
+    """Raw deflate stream (negative wbits), as stored in zip members"""
+    if deflate is not None:
+        return deflate.deflate_compress(data, level)
+    compressor = zlib.compressobj(min(level, ZLIB_MAX_LEVEL), zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+def _read_file(file_path, size):
+    """Reads a whole file with just open/read/close, sized from the scan's stat.
+    open().read() adds fstat calls and a trailing read to find EOF; for thousands
+    of small world files those syscalls cost more than the data."""
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        data = os.read(fd, size + 1)
+        if len(data) > size: # Grew since the scan
+            chunks = [data]
+            while chunk := os.read(fd, STREAM_CHUNK_SIZE):
+                chunks.append(chunk)
+            data = b"".join(chunks)
+        return data
+    finally:
+        os.close(fd)
+
+def _compress_file(file_path, arcname, st, compress_type, level):
+    """Reads and compresses one archive member. Runs on a worker thread, zlib and libdeflate release the GIL."""
+    zinfo = _make_zipinfo(arcname, st)
+    zinfo.compress_type = compress_type
+    data = _read_file(file_path, st.st_size)
+    zinfo.file_size = len(data)
+    if compress_type == zipfile.ZIP_DEFLATED:
+        zinfo.CRC, data = _crc32(data), _deflate(data, level)
+    else:
+        zinfo.CRC = _crc32(data)
+    zinfo.compress_size = len(data)
+    return zinfo, data
+
+def _compress_batch(members, level):
+    """Compresses a list of (file_path, arcname, stat, compress_type) on one worker"""
+    return [_compress_file(file_path, arcname, st, compress_type, level)
+            for file_path, arcname, st, compress_type in members]
+
+def _stream_file(zipf, file_path, zinfo, level):
+    """Writes a member too large to buffer. ZipFile.write feeds zlib 8 KiB at a time;
+    1 MiB chunks keep the per-chunk Python overhead out of the CRC/deflate loop.
+    libdeflate has no streaming API, so these always go through zlib.
+    Not mmap'd: the server may truncate a file mid-read, which is SIGBUS for a mapping.
+    Instead chunks are read into one reused buffer, with no bytes object per chunk."""
+    zinfo._compresslevel = min(level, ZLIB_MAX_LEVEL)
+    buf = bytearray(STREAM_CHUNK_SIZE)
+    view = memoryview(buf)
+    with open(file_path, 'rb', buffering=0) as src, zipf.open(zinfo, 'w') as dest:
+        if hasattr(os, "posix_fadvise"):
+            # Larger readahead while this member is deflated
+            os.posix_fadvise(src.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        while n := src.readinto(buf):
+            dest.write(view[:n])
+
+def _write_compressed(zipf, zinfo, data):
+    """Appends an already compressed member, mirroring ZipFile._open_to_write"""
+    if zipf._seekable:
+        zipf.fp.seek(zipf.start_dir)
+    zinfo.header_offset = zipf.fp.tell()
+    zipf._writecheck(zinfo)
+    zipf._didModify = True
+    zipf.fp.write(zinfo.FileHeader())
+    zipf.fp.write(data)
+    zipf.start_dir = zipf.fp.tell()
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+
 class BackupManager:
     def __init__(self):
         self.current_status = {
@@ -15,50 +175,178 @@ class BackupManager:
             "progress": 0,
             "filename": ""
         }
-        self.cancel_requested = False
+        self.cancel_event = threading.Event() # Set from the API, polled by the backup thread
+        self._paths_cache = None
+        self._paths_version = -1
+        self._list_cache = None # Last list_backups result
+
+    def _paths(self):
+        """Returns (server_dir, backup_dir, backup_dir_real, backup_prefix), resolved
+        again only when the config changed. backup_prefix is the absolute backup dir
+        ending in os.sep."""
+        version = config.version
+        if version != self._paths_version:
+            server_dir = os.path.abspath(os.path.expanduser(config.get("server_dir")))
+            backup_dir = os.path.expanduser(config.get("backup_path"))
+            self._paths_cache = (server_dir, backup_dir, os.path.realpath(backup_dir),
+                                 os.path.join(os.path.abspath(backup_dir), ""))
+            self._paths_version = version
+        return self._paths_cache
 
     def get_status(self):
+        # Never mutated in place, see _update_status
         return self.current_status
+
+    def _update_status(self, **changes):
+        """Publishes a new status snapshot; rebinding is atomic so readers never see a half update"""
+        self.current_status = {**self.current_status, **changes}
     
     def cancel_backup(self):
         if self.current_status["state"] == "running":
-            self.cancel_requested = True
+            self.cancel_event.set()
             app_logger.warning("Backup cancellation requested")
             return {"status": "success", "message": "Cancellation requested"}
         app_logger.warning("Cancel backup failed: No backup running")
         return {"status": "error", "message": "No backup running"}
 
     def list_backups(self):
-        backup_dir = os.path.expanduser(config.get("backup_path"))
-        if not os.path.exists(backup_dir):
+        """Backups newest first. The same list object is returned while the
+        backups are unchanged, so callers can cache anything derived from it."""
+        backup_dir = self._paths()[1]
+        # List zip files (one directory read, one stat per backup)
+        backups = []
+        try:
+            it = os.scandir(backup_dir)
+        except FileNotFoundError:
             app_logger.debug("Backup directory does not exist")
             return []
-        
-        # List zip files
-        files = glob.glob(os.path.join(backup_dir, "*.zip"))
-        backups = []
-        for f in files:
-            try:
-                stat = os.stat(f)
-                backups.append({
-                    "name": os.path.basename(f),
-                    "size": stat.st_size,
-                    "created": datetime.datetime.fromtimestamp(stat.st_mtime).isoformat()
-                })
-            except FileNotFoundError:
-                pass
+        with it:
+            for entry in it:
+                # is_file() uses the cached d_type, no extra syscall
+                if not entry.name.endswith(".zip") or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                    if stat.st_size == 0:
+                        continue # Name reserved by a backup still in progress
+                    backups.append({
+                        "name": entry.name,
+                        "size": stat.st_size,
+                        "created": _fmt_mtime(int(stat.st_mtime))
+                    })
+                except FileNotFoundError:
+                    pass
         app_logger.debug(f"Listed {len(backups)} backups")
-        return sorted(backups, key=lambda x: x["created"], reverse=True)
+        backups.sort(key=lambda x: x["created"], reverse=True)
+        # Always rescanned: the directory mtime misses a zip still being copied
+        # in, and FAT or NFS timestamps are too coarse to trust anyway
+        if backups == self._list_cache:
+            return self._list_cache
+        self._list_cache = backups
+        return backups
 
-    def _get_unique_path(self, directory, filename):
-        """Ensures filename is unique by appending counter if needed"""
+    def _reserve_unique_path(self, directory, filename):
+        """Creates an empty placeholder with a unique name (appending a counter if needed).
+
+        O_EXCL makes the check and the creation a single atomic step, so concurrent
+        backups can never pick the same name.
+        """
         name, ext = os.path.splitext(filename)
         counter = 1
         new_filename = filename
-        while os.path.exists(os.path.join(directory, new_filename)):
-            new_filename = f"{name}_{counter}{ext}"
-            counter += 1
-        return os.path.join(directory, new_filename)
+        while True:
+            path = os.path.join(directory, new_filename)
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                new_filename = f"{name}_{counter}{ext}"
+                counter += 1
+                continue
+            os.close(fd)
+            return path
+
+    def _scan_files(self, root, prefix_len, backup_prefix):
+        """Returns (file_path, arcname, stat) for every file below root, skipping the backup dir.
+
+        root must be absolute; arcname is the path with its first prefix_len characters
+        cut off; backup_prefix is the absolute backup dir ending in os.sep.
+        Each directory is listed as its own pool task, so slow or cold filesystems
+        have many scandir calls in flight instead of one.
+        """
+        if (root + os.sep).startswith(backup_prefix):
+            return []
+
+        files = []
+        pool = ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="backup-scan")
+        try:
+            pending = {pool.submit(_scan_dir, root, prefix_len, backup_prefix)}
+            while pending:
+                if self.cancel_event.is_set(): raise Exception("Cancelled by user")
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dir_files, subdirs = future.result()
+                    files.extend(dir_files)
+                    pending.update(pool.submit(_scan_dir, path, prefix_len, backup_prefix)
+                                   for path in subdirs)
+        finally:
+            pool.shutdown(cancel_futures=True)
+        return files
+
+    def _remove_stale_snapshots(self, arc_base):
+        """Deletes SNAPSHOT_PREFIX dirs in arc_base. The scan skips them, so nothing else
+        would, and they pin old file data (extents or replaced inodes) for good."""
+        try:
+            with os.scandir(arc_base) as it:
+                stale = [entry.path for entry in it
+                         if entry.name.startswith(SNAPSHOT_PREFIX) and entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for path in stale:
+            app_logger.info(f"Removing leftover backup snapshot: {path}")
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _snapshot(self, files_to_zip, snapshot_root):
+        """Reflinks (or failing that, hard links) every scanned file into snapshot_root
+        under its arcname, so the archive reads a stable tree while the server keeps
+        writing. Returns the file list rewritten to point into the snapshot, or None
+        if the filesystem supports neither and the live tree has to be archived.
+
+        Hard links only pin files the server replaces by rename (level.dat, playerdata,
+        .json); a reflink is a real copy-on-write copy of the data.
+        """
+        try:
+            for directory in {os.path.dirname(arcname) for _, arcname, _ in files_to_zip}:
+                os.makedirs(os.path.join(snapshot_root, directory), exist_ok=True)
+        except OSError as e:
+            app_logger.warning(f"Snapshot not possible ({e}), archiving live files")
+            return None
+
+        clone = FICLONE is not None
+        snapshot = []
+        for file_path, arcname, st in files_to_zip:
+            if self.cancel_event.is_set(): raise Exception("Cancelled by user")
+            dst = os.path.join(snapshot_root, arcname)
+            try:
+                if clone:
+                    try:
+                        _clone_file(file_path, dst)
+                    except FileNotFoundError:
+                        raise
+                    except OSError:
+                        # No reflinks here; hard links for this and every later file
+                        clone = False
+                        if os.path.lexists(dst):
+                            os.remove(dst)
+                if not clone:
+                    os.link(file_path, dst)
+            except FileNotFoundError:
+                continue # Deleted since the scan
+            except OSError as e:
+                app_logger.warning(f"Snapshot not possible ({e}), archiving live files")
+                return None
+            snapshot.append((dst, arcname, st))
+        app_logger.debug("Snapshot of %d files via %s", len(snapshot), "reflinks" if clone else "hard links")
+        return snapshot
 
     async def create_backup(self, backup_type="world", world_name="world"):
         if self.current_status["state"] == "running":
@@ -71,29 +359,26 @@ class BackupManager:
             app_logger.info(f"World name: {world_name}")
         app_logger.info("=" * 60)
         
-        if config.get("debug_mode"):
-             print(f"[TRACE] BackupManager.create_backup: type={backup_type} world={world_name}")
-
         self.current_status = {
             "state": "running",
             "message": "Initializing...",
             "progress": 0,
             "filename": ""
         }
-        self.cancel_requested = False
+        self.cancel_event.clear()
         
-        # Fire and forget (run in thread)
-        asyncio.create_task(
-            asyncio.to_thread(self._create_backup_sync, backup_type, world_name)
+        # Fire and forget (run on the dedicated backup worker)
+        asyncio.get_running_loop().run_in_executor(
+            _BACKUP_EXECUTOR, self._create_backup_sync, backup_type, world_name
         )
         
         return {"status": "started", "message": "Backup started"}
 
     def _create_backup_sync(self, backup_type, world_name):
+        snapshot_root = None
         try:
             # ... path setup same as before ...
-            server_dir = os.path.expanduser(config.get("server_dir"))
-            backup_dir = os.path.expanduser(config.get("backup_path"))
+            server_dir, backup_dir, _, backup_prefix = self._paths()
             
             if not os.path.exists(backup_dir):
                 os.makedirs(backup_dir, exist_ok=True)
@@ -104,36 +389,50 @@ class BackupManager:
                 source_root = server_dir
                 base_name = f"full_backup_{timestamp}.zip"
             else:
-                source_root = os.path.join(server_dir, world_name)
+                source_root = os.path.abspath(os.path.join(server_dir, world_name))
                 base_name = f"world_backup_{world_name}_{timestamp}.zip"
                 if not os.path.exists(source_root):
                     app_logger.error(f"World folder '{world_name}' not found")
                     raise FileNotFoundError(f"World folder '{world_name}' not found.")
 
+            target_zip = self._reserve_unique_path(backup_dir, base_name)
+            base_name = os.path.basename(target_zip)
+
             app_logger.info(f"Backup source: {source_root}")
             app_logger.info(f"Backup destination: {backup_dir}")
             app_logger.info(f"Backup filename: {base_name}")
-
-            target_zip = self._get_unique_path(backup_dir, base_name)
             
             # 1. Count files
-            self.current_status["message"] = "Scanning files..."
-            total_files = 0
-            files_to_zip = []
-            
-            abs_backup_dir = os.path.abspath(backup_dir)
-            
-            for root, dirs, files in os.walk(source_root):
-                if self.cancel_requested: raise Exception("Cancelled by user")
-                
-                if os.path.abspath(root).startswith(abs_backup_dir):
-                    continue
-                
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, server_dir if backup_type == "full" else os.path.dirname(source_root))
-                    files_to_zip.append((file_path, arcname))
-                    total_files += 1
+            self._update_status(message="Scanning files...")
+            # Both backup types archive paths relative to the server dir.
+            # Everything below it starts with this prefix, so arcnames are a slice.
+            arc_base = os.path.join(server_dir, "")
+            if not os.path.join(source_root, "").startswith(arc_base):
+                # World outside the server dir (e.g. "../world"): keep the slice valid
+                arc_base = os.path.join(os.path.dirname(source_root), "")
+            prefix_len = len(arc_base)
+
+            # Single traversal; the list is reused for archiving
+            files_to_zip = self._scan_files(source_root, prefix_len, backup_prefix)
+
+            # Left behind if the process died mid-backup; only one backup runs at a time
+            self._remove_stale_snapshots(arc_base)
+
+            if files_to_zip and config.get("backup_snapshot"):
+                self._update_status(message="Snapshotting files...")
+                try:
+                    # Below arc_base, so on the same filesystem as the files it links to
+                    snapshot_root = tempfile.mkdtemp(prefix=SNAPSHOT_PREFIX, dir=arc_base)
+                except OSError as e:
+                    # E.g. a server dir we may read but not write
+                    app_logger.warning(f"Snapshot not possible ({e}), archiving live files")
+                else:
+                    snapshot = self._snapshot(files_to_zip, snapshot_root)
+                    if snapshot is not None:
+                        files_to_zip = snapshot
+
+            total_files = len(files_to_zip)
+            total_bytes = sum(st.st_size for _, _, st in files_to_zip) or 1
 
             if total_files == 0:
                 app_logger.error("No files found to backup")
@@ -142,34 +441,22 @@ class BackupManager:
             app_logger.info(f"Found {total_files} files to backup")
 
             # 2. Create Zip (Fast Mode)
-            self.current_status["message"] = f"Archiving {total_files} files..."
-            self.current_status["filename"] = base_name
-            app_logger.info("Starting compression (level 1 - fast mode)...")
+            self._update_status(message=f"Archiving {total_files} files...", filename=base_name)
+            level = int(config.get("backup_compress_level"))
+            app_logger.info(f"Starting compression (level {level}, {'libdeflate' if deflate is not None else 'zlib'})...")
             
-            fd, temp_zip_path = tempfile.mkstemp(suffix=".zip")
-            os.close(fd)
+            # Next to the target, so finalizing is a rename rather than a copy. The name
+            # is ours since target_zip was reserved; .part keeps it out of list_backups.
+            temp_zip_path = target_zip + ".part"
             
-            import zipfile
-            processed = 0
-            # Use ZIP_STORED for speed, ZIP_DEFLATED for size. User asked for speed.
-            # ZIP_STORED is just a container, no CPU usage for compression.
-            with zipfile.ZipFile(temp_zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zipf:
-                 for file_path, arcname in files_to_zip:
-                    if self.cancel_requested: raise Exception("Cancelled by user")
-                    
-                    zipf.write(file_path, arcname)
-                    processed += 1
-                    if processed % 100 == 0: # Check less often for speed
-                        self.current_status["progress"] = int((processed / total_files) * 100)
-                        if processed % 500 == 0:  # Log every 500 files
-                            app_logger.debug(f"Compression progress: {processed}/{total_files} files ({self.current_status['progress']}%)")
+            self._write_archive(temp_zip_path, files_to_zip, total_files, total_bytes, level)
 
             # 3. Move
-            if self.cancel_requested: raise Exception("Cancelled by user")
+            if self.cancel_event.is_set(): raise Exception("Cancelled by user")
             
-            self.current_status["message"] = "Finalizing..."
+            self._update_status(message="Finalizing...")
             app_logger.info("Moving backup to final destination...")
-            shutil.move(temp_zip_path, target_zip)
+            os.replace(temp_zip_path, target_zip)
             os.chmod(target_zip, 0o644)
             
             backup_size_mb = os.path.getsize(target_zip) / (1024 * 1024)
@@ -189,6 +476,9 @@ class BackupManager:
             # Cleanup
             if 'temp_zip_path' in locals() and os.path.exists(temp_zip_path):
                 os.remove(temp_zip_path)
+            # Drop the reserved name unless the archive already replaced it
+            if 'target_zip' in locals() and os.path.exists(target_zip) and os.path.getsize(target_zip) == 0:
+                os.remove(target_zip)
             
             state = "cancelled" if str(e) == "Cancelled by user" else "error"
             if state == "cancelled":
@@ -202,13 +492,96 @@ class BackupManager:
                 "progress": 0,
                 "filename": ""
             }
+        finally:
+            if snapshot_root is not None:
+                shutil.rmtree(snapshot_root, ignore_errors=True)
+
+    def _write_archive(self, zip_path, files_to_zip, total_files, total_bytes, level):
+        """Writes the files into zip_path, compressing members in parallel on a thread pool"""
+        processed = 0
+        processed_bytes = 0
+        last_update = last_log = time.monotonic()
+
+        def report():
+            # Called once per batch or streamed file, throttled by time rather than file count
+            nonlocal last_update, last_log
+            now = time.monotonic()
+            if now - last_update < PROGRESS_INTERVAL:
+                return
+            last_update = now
+            # Progress by bytes: a few large region files dominate the runtime
+            progress = int((processed_bytes / total_bytes) * 100)
+            self._update_status(progress=progress)
+            if now - last_log >= PROGRESS_LOG_INTERVAL:
+                last_log = now
+                app_logger.debug("Compression progress: %d/%d files (%d%%)", processed, total_files, progress)
+
+        pool = ThreadPoolExecutor(max_workers=COMPRESS_WORKERS)
+        pending = deque() # (future, input bytes) in submission order
+        pending_bytes = 0
+        try:
+            # Use ZIP_STORED for speed, ZIP_DEFLATED for size. User asked for speed.
+            # ZIP_STORED is just a container, no CPU usage for compression, so it is
+            # used for files that are already compressed.
+            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                batch = []
+                batch_bytes = 0
+
+                def flush(limit):
+                    nonlocal processed, processed_bytes, pending_bytes
+                    # Members are written in submission order
+                    while pending and (len(pending) > limit or pending_bytes > MAX_PENDING_BYTES):
+                        future, size = pending.popleft()
+                        pending_bytes -= size
+                        members = future.result()
+                        for zinfo, data in members:
+                            _write_compressed(zipf, zinfo, data)
+                            processed_bytes += zinfo.file_size
+                        processed += len(members)
+                        report()
+
+                def submit_batch():
+                    nonlocal batch, batch_bytes, pending_bytes
+                    # Checked per batch rather than per file
+                    if self.cancel_event.is_set(): raise Exception("Cancelled by user")
+                    if batch:
+                        pending.append((pool.submit(_compress_batch, batch, level), batch_bytes))
+                        pending_bytes += batch_bytes
+                        batch = []
+                        batch_bytes = 0
+                    flush(MAX_PENDING)
+
+                for file_path, arcname, st in files_to_zip:
+                    ext = os.path.splitext(arcname)[1].lower()
+                    compress_type = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+                    if st.st_size > MAX_BUFFERED_SIZE:
+                        # Too large to hold in memory: write what is queued, then stream it
+                        submit_batch()
+                        flush(0)
+                        zinfo = _make_zipinfo(arcname, st)
+                        zinfo.compress_type = compress_type
+                        _stream_file(zipf, file_path, zinfo, level)
+                        processed += 1
+                        processed_bytes += st.st_size
+                        report()
+                    else:
+                        batch.append((file_path, arcname, st, compress_type))
+                        batch_bytes += st.st_size
+                        if len(batch) >= BATCH_MAX_FILES or batch_bytes >= BATCH_MAX_BYTES:
+                            submit_batch()
+                submit_batch()
+                flush(0)
+        finally:
+            pool.shutdown(cancel_futures=True)
 
     def delete_backup(self, filename):
-        backup_dir = os.path.expanduser(config.get("backup_path"))
+        _, backup_dir, backup_dir_real, _ = self._paths()
         target = os.path.join(backup_dir, filename)
         
-        # Security check
-        if not os.path.abspath(target).startswith(os.path.abspath(backup_dir)):
+        # Security check: must resolve to a file inside the backup dir (a prefix
+        # check would also accept siblings such as backups2/)
+        real = os.path.realpath(target)
+        if real == backup_dir_real or os.path.commonpath([real, backup_dir_real]) != backup_dir_real:
              app_logger.error(f"Backup deletion denied: Invalid path attempted - {filename}")
              return {"status": "error", "message": "Invalid path"}
 
@@ -221,7 +594,7 @@ class BackupManager:
         return {"status": "error", "message": "File not found"}
 
     def get_disk_usage(self):
-        backup_dir = os.path.expanduser(config.get("backup_path"))
+        backup_dir = self._paths()[1]
         if not os.path.exists(backup_dir):
             os.makedirs(backup_dir, exist_ok=True)
             app_logger.debug("Created backup directory")
@@ -1,9 +1,17 @@
 import json
 import os
 import secrets
+import atexit
+import threading
 from typing import Dict, Any
 
+try:
+    import orjson # Optional, faster and encodes straight to bytes
+except ImportError:
+    orjson = None
+
 CONFIG_FILE = "config.json"
+SAVE_DELAY = 0.5 # Seconds; set() calls within this window share one write
 
 DEFAULT_CONFIG = {
     "server_name": "My Minecraft Server",
@@ -13,15 +21,31 @@ DEFAULT_CONFIG = {
     "ram_max": "2G",
     "server_dir": ".",
     "backup_path": "./backups",
+    "backup_compress_level": 1,  # Deflate level, 1 = fastest (1-9, up to 12 with libdeflate)
+    "backup_snapshot": True,  # Archive a reflink/hard link snapshot instead of the live files
     "admin_password_hash": "",  # SHA256 hash
     "secret_key": secrets.token_hex(32),
     "debug_mode": False
 }
 
+def _dumps(data) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+def _loads(raw: bytes):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
 class ConfigManager:
     def __init__(self):
         self.config = {}
+        self.version = 0 # Bumped on every change, lets callers cache derived values
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._save_timer = None
+        self._server_root = None # (version, path), see server_root
         self.config = self.load_config()
+        atexit.register(self.flush)
 
     def load_config(self) -> Dict[str, Any]:
         if not os.path.exists(CONFIG_FILE):
@@ -29,8 +53,8 @@ class ConfigManager:
             return DEFAULT_CONFIG.copy()
         
         try:
-            with open(CONFIG_FILE, 'r') as f:
-                data = json.load(f)
+            with open(CONFIG_FILE, 'rb') as f:
+                data = _loads(f.read())
                 # Merge with default to ensure new keys (like debug_mode) are present
                 c = DEFAULT_CONFIG.copy()
                 c.update(data)
@@ -39,26 +63,54 @@ class ConfigManager:
             return DEFAULT_CONFIG.copy()
 
     def save_config(self, new_config: Dict[str, Any]):
-        self.config.update(new_config)
-        
-        # Atomic write
-        import tempfile
-        tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(CONFIG_FILE)), text=True)
-        try:
-            with os.fdopen(tmp_fd, 'w') as f:
-                json.dump(self.config, f, indent=4)
-            os.replace(tmp_path, CONFIG_FILE)
-        except Exception as e:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-            print(f"[ERROR] Failed to save config: {e}")
+        with self._lock:
+            self.config.update(new_config)
+            self.version += 1
+            self._dirty = False
+            
+            # Atomic write
+            import tempfile
+            tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(CONFIG_FILE)))
+            try:
+                with os.fdopen(tmp_fd, 'wb') as f:
+                    f.write(_dumps(self.config))
+                os.replace(tmp_path, CONFIG_FILE)
+            except Exception as e:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                print(f"[ERROR] Failed to save config: {e}")
+
+    def flush(self):
+        """Write changes from set() now instead of waiting for the save timer"""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if self._dirty:
+                self.save_config(self.config)
+
+    def server_root(self) -> str:
+        """server_dir with ~ expanded and symlinks resolved, cached until the config changes"""
+        cached = self._server_root
+        if cached is None or cached[0] != self.version:
+            cached = (self.version, os.path.realpath(os.path.expanduser(self.config.get("server_dir"))))
+            self._server_root = cached
+        return cached[1]
 
     def get(self, key: str, default=None):
         return self.config.get(key, default)
 
     def set(self, key: str, value: Any):
-        self.config[key] = value
-        self.save_config(self.config)
+        """Update a key in memory; the file is written at most SAVE_DELAY later (or at exit)"""
+        with self._lock:
+            self.config[key] = value
+            self.version += 1
+            self._dirty = True
+            # Not restarted by later calls, so a steady stream of sets still gets saved
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
 
 # Global instance
 config = ConfigManager()
@@ -1,16 +1,35 @@
 import sys
 import queue
 import os
+import time
+import atexit
+import asyncio
+import logging
+import threading
 from datetime import datetime
 from pathlib import Path
+from app.config import config
+
+FLUSH_INTERVAL = 1.0 # Seconds the log file may lag behind while busy
+BROADCAST_INTERVAL = 0.02 # Lines arriving within this window go out as one message
 
 class AppLogger:
     def __init__(self):
+        # Same numeric levels as the logging module; DEBUG only in debug mode
+        self.level = logging.DEBUG if config.get("debug_mode") else logging.INFO
         self.terminal = sys.stdout
-        self.log_queue = queue.Queue()
-        self.listeners = []
+        self.listeners = [] # asyncio.Queues of WebSocket clients, see add_listener
+        self._loop = None
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._pending_event = threading.Event()
+        threading.Thread(target=self._broadcast_loop, name="log-broadcast", daemon=True).start()
         self.log_file = None
         self.log_file_path = None
+        self._stamp = (None, "", "") # (second, full, short), see _timestamps
+        # Lines for the log file; only the writer thread touches the file
+        self._file_queue = queue.SimpleQueue()
+        self._writer = None
         
         # Create logs directory
         self._setup_log_file()
@@ -32,9 +51,12 @@ class AppLogger:
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         self.log_file_path = logs_dir / f"app_{timestamp}.log"
         
-        # Open log file
+        # Open log file. Block buffered: the writer thread flushes, see _writer_loop
         try:
-            self.log_file = open(self.log_file_path, 'w', encoding='utf-8', buffering=1)
+            self.log_file = open(self.log_file_path, 'w', encoding='utf-8')
+            self._writer = threading.Thread(target=self._writer_loop, name="log-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
             self._write_to_file(f"=== Application Log Started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n")
             self._write_to_file(f"Log file: {self.log_file_path}\n")
             self._write_to_file("=" * 80 + "\n")
@@ -42,73 +64,138 @@ class AppLogger:
             print(f"ERROR: Failed to create log file: {e}", file=sys.__stdout__)
 
     def _write_to_file(self, message):
-        """Write message to log file"""
+        """Queue message for the log file; the caller never waits on disk"""
         if self.log_file:
+            self._file_queue.put(message)
+
+    def _writer_loop(self):
+        """Writes queued lines. Flushes when idle, or every FLUSH_INTERVAL under load."""
+        last_flush = time.monotonic()
+        while True:
             try:
-                self.log_file.write(message)
-                self.log_file.flush()
+                message = self._file_queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                message = ""
+            if message is None: # Sentinel from close()
+                break
+            try:
+                if message:
+                    self.log_file.write(message)
+                now = time.monotonic()
+                if self._file_queue.empty() or now - last_flush >= FLUSH_INTERVAL:
+                    self.log_file.flush()
+                    last_flush = now
             except Exception as e:
                 print(f"ERROR: Failed to write to log file: {e}", file=sys.__stdout__)
 
+    def _timestamps(self):
+        """Returns (full, short) timestamps for now, formatted at most once per second"""
+        second = int(time.time())
+        stamp = self._stamp
+        if stamp[0] != second:
+            t = time.localtime(second)
+            stamp = (second, time.strftime("%Y-%m-%d %H:%M:%S", t), time.strftime("%H:%M:%S", t))
+            self._stamp = stamp # One assignment, so threads never see a mixed pair
+        return stamp[1], stamp[2]
+
     def write(self, message):
         """Capture all stdout/stderr and write to console, file, and WebSocket"""
         self.terminal.write(message)
         
-        if message.strip():
-            # Full timestamp for file
-            full_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self._write_to_file(f"[{full_timestamp}] {message.strip()}\n")
-            
-            # Short timestamp for WebSocket
-            short_timestamp = datetime.now().strftime("%H:%M:%S")
-            formatted = f"[{short_timestamp}] {message.strip()}"
-            self.broadcast(formatted)
+        message = message.strip()
+        if message:
+            # Full timestamp for file, short one for WebSocket
+            full_timestamp, short_timestamp = self._timestamps()
+            self._write_to_file(f"[{full_timestamp}] {message}\n")
+            if self.listeners:
+                self.broadcast(f"[{short_timestamp}] {message}")
 
     def flush(self):
+        # The log file is flushed by the writer thread
         self.terminal.flush()
-        if self.log_file:
-            self.log_file.flush()
 
     def log(self, message, level="INFO"):
         """Log a message with a specific level"""
-        full_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        formatted_message = f"[{full_timestamp}] [{level}] {message}"
-        self.terminal.write(formatted_message + "\n")
-        self._write_to_file(formatted_message + "\n")
+        full_timestamp, short_timestamp = self._timestamps()
+        formatted_message = f"[{full_timestamp}] [{level}] {message}\n"
+        self.terminal.write(formatted_message)
+        self._write_to_file(formatted_message)
         
         # Also broadcast to WebSocket with short timestamp
-        short_timestamp = datetime.now().strftime("%H:%M:%S")
-        ws_message = f"[{short_timestamp}] [{level}] {message}"
-        self.broadcast(ws_message)
+        if self.listeners:
+            self.broadcast(f"[{short_timestamp}] [{level}] {message}")
+
+    def setLevel(self, level):
+        """Set the minimum level (logging.DEBUG, logging.INFO, ...) that gets written"""
+        self.level = level
+
+    def isEnabledFor(self, level):
+        return level >= self.level
 
-    def debug(self, message):
+    def _log_at(self, levelno, level, message, args):
+        # %-style args are only formatted when the level is enabled
+        if levelno >= self.level:
+            self.log(message % args if args else message, level)
+
+    def debug(self, message, *args):
         """Log a debug message"""
-        self.log(message, "DEBUG")
+        self._log_at(logging.DEBUG, "DEBUG", message, args)
     
-    def info(self, message):
+    def info(self, message, *args):
         """Log an info message"""
-        self.log(message, "INFO")
+        self._log_at(logging.INFO, "INFO", message, args)
     
-    def warning(self, message):
+    def warning(self, message, *args):
         """Log a warning message"""
-        self.log(message, "WARN")
+        self._log_at(logging.WARNING, "WARN", message, args)
     
-    def error(self, message):
+    def error(self, message, *args):
         """Log an error message"""
-        self.log(message, "ERROR")
+        self._log_at(logging.ERROR, "ERROR", message, args)
+
+    def add_listener(self, client_queue):
+        """Subscribe an asyncio.Queue; must be called from the event loop that reads it"""
+        self._loop = asyncio.get_running_loop()
+        self.listeners.append(client_queue)
+
+    def remove_listener(self, client_queue):
+        if client_queue in self.listeners:
+            self.listeners.remove(client_queue)
 
     def broadcast(self, message):
-        """Broadcast to WebSocket listeners"""
+        """Queue a line for WebSocket listeners; the broadcaster thread sends them in batches"""
+        with self._pending_lock:
+            self._pending.append(message)
+        self._pending_event.set()
+
+    def _broadcast_loop(self):
+        """Hands pending lines to the event loop as one newline-joined message per batch"""
+        while True:
+            self._pending_event.wait()
+            time.sleep(BROADCAST_INTERVAL) # Let a burst of lines collect
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+                self._pending_event.clear()
+            if batch and self._loop is not None:
+                try:
+                    self._loop.call_soon_threadsafe(self._deliver, "\n".join(batch))
+                except RuntimeError:
+                    pass # Loop closed during shutdown
+
+    def _deliver(self, message):
+        # Runs on the event loop, where asyncio.Queue may be used
         for q in list(self.listeners):
-             try:
-                 q.put_nowait(message)
-             except queue.Full:
-                 pass
+            try:
+                q.put_nowait(message)
+            except asyncio.QueueFull:
+                pass
 
     def close(self):
-        """Close the log file"""
+        """Drain the writer thread and close the log file. Registered with atexit."""
         if self.log_file:
             self._write_to_file(f"\n=== Application Log Ended at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===\n")
+            self._file_queue.put(None)
+            self._writer.join()
             self.log_file.close()
             self.log_file = None
 
@@ -1,6 +1,6 @@
 from fastapi import FastAPI, Depends, WebSocket, WebSocketDisconnect, HTTPException, Request, Query, status
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from app.auth import oauth2_scheme, verify_password, create_access_token, get_current_active_user, config, hash_password, verify_token_str
 from app.server_manager import server_manager
@@ -8,14 +8,36 @@ from app.rate_limiter import check_rate_limit, record_failed_attempt
 from app.backup_manager import backup_manager
 from pydantic import BaseModel
 import asyncio
+import hashlib
+import json
+import logging
 import os
+import shutil
+import tempfile
 from app.logger import app_logger
 
+try:
+    import orjson # Optional, several times faster than json for API payloads
+except ImportError:
+    orjson = None
+
 app_logger.info("="*80)
 app_logger.info("MINECRAFT SERVER MANAGER APPLICATION STARTING")
 app_logger.info("="*80)
 
-app = FastAPI()
+def dump_json(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    # Same encoding as Starlette's JSONResponse
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with dump_json (fastapi's ORJSONResponse is deprecated
+    and requires orjson)"""
+    def render(self, content) -> bytes:
+        return dump_json(content)
+
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -41,6 +63,25 @@ class PasswordChange(BaseModel):
 class Command(BaseModel):
     command: str
 
+# Conditional GET for the endpoints the dashboard polls
+_etag_cache = {} # key -> (payload, version, etag, body)
+
+def json_with_etag(request: Request, key: str, payload, version=None):
+    """JSON response with an ETag; answers 304 when the client already has it.
+
+    The encoded body is reused while `payload` is the same object and `version`
+    is unchanged, so an idle poll costs neither encoding nor transfer."""
+    cached = _etag_cache.get(key)
+    if cached is None or cached[0] is not payload or cached[1] != version:
+        body = dump_json(payload)
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        cached = _etag_cache[key] = (payload, version, etag, body)
+    etag = cached[2]
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(cached[3], media_type="application/json", headers=headers)
+
 @app.post("/token", response_model=Token)
 async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     client_ip = request.client.host
@@ -56,19 +97,28 @@ async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequ
     app_logger.info(f"✓ Successful login from {client_ip} for user: {form_data.username}")
     return {"access_token": access_token, "token_type": "bearer"}
 
+INDEX_HTML_PATH = "app/static/index.html"
+_index_html = None # Read once; the page only changes with an update, which restarts the app
+
 @app.get("/", response_class=HTMLResponse)
 async def get_root():
-    return FileResponse("app/static/index.html")
+    global _index_html
+    if _index_html is None:
+        with open(INDEX_HTML_PATH, 'rb') as f:
+            _index_html = f.read()
+    return HTMLResponse(_index_html, headers={"Cache-Control": "public, max-age=60"})
 
 @app.get("/api/stats")
 async def get_stats(current_user: str = Depends(get_current_active_user)):
-    app_logger.info(f"/api/stats called by user: {current_user}")
-    return server_manager.get_stats()
+    # Polled every few seconds by every open dashboard; only worth logging when debugging
+    app_logger.debug("/api/stats called by user: %s", current_user)
+    # Plain dict of str/float, returning the response skips jsonable_encoder
+    return FastJSONResponse(server_manager.get_stats())
 
 @app.post("/api/start")
 async def start_server(current_user: str = Depends(get_current_active_user)):
     app_logger.info(f"Server start requested by user: {current_user}")
-    return server_manager.start_server()
+    return await server_manager.start_server()
 
 @app.post("/api/stop")
 async def stop_server(current_user: str = Depends(get_current_active_user)):
@@ -82,8 +132,9 @@ async def send_command(cmd: Command, current_user: str = Depends(get_current_act
     return {"status": "sent"}
 
 @app.get("/api/settings")
-async def get_settings(current_user: str = Depends(get_current_active_user)):
-    return config.config
+async def get_settings(request: Request, current_user: str = Depends(get_current_active_user)):
+    # config.config is updated in place, its version tells when it changed
+    return json_with_etag(request, "settings", config.config, config.version)
 
 @app.post("/api/settings")
 async def update_settings(settings: Settings, current_user: str = Depends(get_current_active_user)):
@@ -102,6 +153,7 @@ async def update_settings(settings: Settings, current_user: str = Depends(get_cu
     config.set("server_dir", settings.server_dir)
     config.set("backup_path", settings.backup_path)
     config.set("debug_mode", settings.debug_mode)
+    app_logger.setLevel(logging.DEBUG if settings.debug_mode else logging.INFO)
     app_logger.info("✓ Settings updated successfully")
     return {"status": "updated"}
 
@@ -118,52 +170,113 @@ async def change_password(data: PasswordChange, current_user: str = Depends(get_
     return {"status": "success", "message": "Password changed"}
 
 # File Editor
+FILE_EDIT_MAX_BYTES = 256 * 1024 # Larger files are only served raw, see /api/file/raw
+
+def _read_text(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def _write_text(path, content):
+    # Write a sibling temp file and swap it in, so a crash mid-save never
+    # leaves a half written server.properties behind
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".edit_")
+    try:
+        with os.fdopen(tmp_fd, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600; keep the old file's mode, or what open() would give
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def resolve_server_path(path):
+    """Resolves a client supplied path inside the server dir, or returns None if it
+    points outside (commonpath, so a sibling like /srv/mc-evil doesn't pass as /srv/mc)"""
+    server_root = config.server_root()
+    target = os.path.realpath(os.path.join(server_root, path))
+    if os.path.commonpath([target, server_root]) != server_root:
+        return None
+    return target
+
 @app.get("/api/file")
 async def get_file_content(path: str, current_user: str = Depends(get_current_active_user)):
     app_logger.info(f"File read requested by {current_user}: {path}")
-    target = os.path.realpath(os.path.join(config.get("server_dir"), path))
-    server_root = os.path.realpath(config.get("server_dir"))
+    target = resolve_server_path(path)
     
-    if not target.startswith(server_root):
+    if target is None:
         app_logger.warning(f"File access denied: {path} (outside server root)")
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if os.path.exists(target) and os.path.isfile(target):
+    if os.path.isfile(target):
+        size = os.path.getsize(target)
+        if size > FILE_EDIT_MAX_BYTES:
+            app_logger.info(f"File too large for the editor: {path} ({size} bytes)")
+            # No content, so a client can't save a placeholder back over the file
+            return {"content": None, "too_large": True, "size": size,
+                    "message": f"File is too large to edit here ({size // 1024} KB). Use Download to get a copy."}
         try:
-            with open(target, 'r') as f:
-                return {"content": f.read()}
+            # Disk reads stay off the event loop
+            return {"content": await asyncio.to_thread(_read_text, target)}
         except Exception:
              app_logger.error(f"Error reading file: {path}")
              return {"content": "Error reading file."}
     return {"content": ""}
 
+@app.get("/api/file/raw")
+async def get_file_raw(path: str, current_user: str = Depends(get_current_active_user)):
+    """Streams a file as is, without loading it into memory or JSON encoding it"""
+    app_logger.info(f"Raw file read requested by {current_user}: {path}")
+    target = resolve_server_path(path)
+    
+    if target is None:
+        app_logger.warning(f"File access denied: {path} (outside server root)")
+        raise HTTPException(status_code=403, detail="Access denied")
+    if not os.path.isfile(target):
+        raise HTTPException(status_code=404, detail="File not found")
+    # Starlette streams it from a worker thread, or hands the path to the
+    # server (pathsend) when the ASGI server supports it
+    return FileResponse(target, media_type="text/plain", filename=os.path.basename(target))
+
 @app.post("/api/file")
-async def save_file_content(path: str, content: Command, current_user: str = Depends(get_current_active_user)): 
+async def save_file_content(path: str, content: Command, force: bool = False, current_user: str = Depends(get_current_active_user)): 
     app_logger.info(f"File save requested by {current_user}: {path}")
-    target = os.path.realpath(os.path.join(config.get("server_dir"), path))
-    server_root = os.path.realpath(config.get("server_dir"))
+    target = resolve_server_path(path)
     
-    if not target.startswith(server_root):
+    if target is None:
         app_logger.warning(f"File save denied: {path} (outside server root)")
         raise HTTPException(status_code=403, detail="Access denied")
+    # The editor never loaded such a file, so this is most likely a stale page
+    # or client posting something else over it
+    if not force and os.path.isfile(target) and os.path.getsize(target) > FILE_EDIT_MAX_BYTES:
+        app_logger.warning(f"File save denied: {path} (too large for the editor)")
+        raise HTTPException(status_code=409, detail="File is too large to edit here. Add force=true to overwrite it anyway.")
     
-    with open(target, 'w') as f:
-        f.write(content.command)
+    await asyncio.to_thread(_write_text, target, content.command)
     app_logger.info(f"✓ File saved: {path}")
     return {"status": "saved"}
 
 # Backups
 @app.get("/api/backups")
-async def list_backups(current_user: str = Depends(get_current_active_user)):
-    return backup_manager.list_backups()
+async def list_backups(request: Request, current_user: str = Depends(get_current_active_user)):
+    return json_with_etag(request, "backups", backup_manager.list_backups())
 
 @app.get("/api/backups/usage")
-async def get_backup_usage(current_user: str = Depends(get_current_active_user)):
-    return backup_manager.get_disk_usage()
+async def get_backup_usage(request: Request, current_user: str = Depends(get_current_active_user)):
+    return json_with_etag(request, "usage", backup_manager.get_disk_usage())
 
 @app.get("/api/backups/status")
-async def get_backup_status(current_user: str = Depends(get_current_active_user)):
-    return backup_manager.get_status()
+async def get_backup_status(request: Request, current_user: str = Depends(get_current_active_user)):
+    return json_with_etag(request, "status", backup_manager.get_status())
 
 @app.post("/api/backups/cancel")
 async def cancel_backup_task(current_user: str = Depends(get_current_active_user)):
@@ -180,48 +293,69 @@ async def delete_backup(filename: str, current_user: str = Depends(get_current_a
     return backup_manager.delete_backup(filename)
 
 # Logs
+TAIL_BLOCK_SIZE = 8192
+_tail_cache = {} # (path, lines) -> (mtime_ns, size, content)
+
+def tail_file(path, lines, block=TAIL_BLOCK_SIZE):
+    """Returns the last `lines` lines of a file, reading backwards in blocks
+    so the cost depends on the tail length, not the file size"""
+    if lines <= 0:
+        return ""
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        key = (path, lines)
+        cached = _tail_cache.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2] # Unchanged since the last poll
+
+        pos = st.st_size
+        chunks = []
+        newlines = 0
+        # lines + 1 newlines guarantee the first kept line is complete
+        while pos > 0 and newlines <= lines:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+        buf = b"".join(reversed(chunks))
+        content = b"".join(buf.splitlines(keepends=True)[-lines:]).decode('utf-8', 'ignore')
+
+    if len(_tail_cache) >= 16:
+        _tail_cache.clear()
+    _tail_cache[key] = (st.st_mtime_ns, st.st_size, content)
+    return content
+
 @app.get("/api/logs")
 async def get_logs(lines: int = 200, current_user: str = Depends(get_current_active_user)):
     """Reads the last N lines of logs/latest.log"""
-    log_path = os.path.join(config.get("server_dir"), "logs", "latest.log")
-    if not os.path.exists(log_path):
-        return {"content": "No log file found."}
-    
+    log_path = os.path.join(config.server_root(), "logs", "latest.log")
     try:
-        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-            # Efficient tail implementation is needed for huge logs, 
-            # but for this scale reading all is okay-ish or seek.
-            # Let's do a simple readlines and tail.
-            all_lines = f.readlines()
-            return {"content": "".join(all_lines[-lines:])}
+        # Disk reads stay off the event loop
+        return {"content": await asyncio.to_thread(tail_file, log_path, lines)}
+    except FileNotFoundError:
+        return {"content": "No log file found."}
     except Exception as e:
         return {"content": f"Error reading log: {str(e)}"}
 
 
 @app.on_event("startup")
 async def startup_event():
-    asyncio.create_task(broadcast_logs())
-
-async def broadcast_logs():
-    """Background task to broadcast logs to all connected clients."""
-    while True:
-        try:
-            # Blocking get from queue, run in thread
-            line = await asyncio.to_thread(server_manager.publish_queue.get)
-            
-            # Broadcast to all client queues
-            # We iterate a copy to handle dynamic addition/removal safely, 
-            # though usually list operations are atomic enough for this in GIL.
-            for q in list(server_manager.listeners):
-                try:
-                    q.put_nowait(line)
-                except asyncio.QueueFull:
-                    pass # Slow client, drop message?
-        except Exception as e:
-            print(f"Broadcast error: {e}")
-            await asyncio.sleep(1)
+    asyncio.create_task(server_manager.stats_loop())
 
+WS_BATCH_MAX = 64 # Queued messages merged into one WebSocket frame
 
+async def next_batch(client_queue, sep):
+    """Waits for a message, then joins whatever else is already queued, so a
+    burst of lines costs one frame instead of one per line"""
+    items = [await client_queue.get()]
+    while len(items) < WS_BATCH_MAX:
+        try:
+            items.append(client_queue.get_nowait())
+        except asyncio.QueueEmpty:
+            break
+    return sep.join(items)
 
 @app.websocket("/ws/debug")
 async def websocket_debug(websocket: WebSocket, token: str = Query(None)):
@@ -237,22 +371,19 @@ async def websocket_debug(websocket: WebSocket, token: str = Query(None)):
     app_logger.info("Debug WebSocket client connected")
     
     client_queue = asyncio.Queue(maxsize=500)
-    app_logger.listeners.append(client_queue)
+    app_logger.add_listener(client_queue)
     
     try:
         while True:
-            # Simple stream of app logs
-            line = await client_queue.get()
-            await websocket.send_text(line)
+            # App log lines, newline-joined in batches by AppLogger
+            await websocket.send_text(await next_batch(client_queue, "\n"))
             
     except WebSocketDisconnect:
         app_logger.info("Debug WebSocket client disconnected")
-        if client_queue in app_logger.listeners:
-            app_logger.listeners.remove(client_queue)
+        app_logger.remove_listener(client_queue)
     except Exception as e:
         app_logger.error(f"Debug WebSocket error: {e}")
-        if client_queue in app_logger.listeners:
-            app_logger.listeners.remove(client_queue)
+        app_logger.remove_listener(client_queue)
 
 # WebSocket for Console
 @app.websocket("/ws/console")
@@ -265,27 +396,24 @@ async def websocket_endpoint(websocket: WebSocket, token: str = Query(None)):
     await websocket.accept()
     app_logger.info("Console WebSocket client connected")
     
-    # Create a personal queue for this client
+    # Create a personal queue for this client; the server output reader fills it
     client_queue = asyncio.Queue(maxsize=500)
-    server_manager.listeners.append(client_queue)
-    if config.get("debug_mode"): print(f"[TRACE] WS: Console Client connected. Total clients: {len(server_manager.listeners)}")
+    server_manager.add_listener(client_queue)
+    app_logger.debug("Console clients connected: %d", len(server_manager.listeners))
     
     try:
-        # Send history first
-        for line in list(server_manager.log_history):
-             await websocket.send_text(line)
+        # Send history first, in one frame
+        history = server_manager.history_text()
+        if history:
+            await websocket.send_text(history)
 
         while True:
-            line = await client_queue.get()
-            await websocket.send_text(line)
+            # Console lines keep their own newlines
+            await websocket.send_text(await next_batch(client_queue, ""))
             
     except WebSocketDisconnect:
         app_logger.info("Console WebSocket client disconnected")
-        if config.get("debug_mode"): print(f"[TRACE] WS: Console Client disconnected.")
-        if client_queue in server_manager.listeners:
-            server_manager.listeners.remove(client_queue)
+        server_manager.remove_listener(client_queue)
     except Exception as e:
         app_logger.error(f"Console WebSocket error: {e}")
-        if config.get("debug_mode"): print(f"[TRACE] WS: Error {e}")
-        if client_queue in server_manager.listeners:
-            server_manager.listeners.remove(client_queue)
+        server_manager.remove_listener(client_queue)
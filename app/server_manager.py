@@ -1,84 +1,139 @@
 import asyncio
 import subprocess
 import os
+import time
+import select
 import psutil
-import queue
 from collections import deque
 from typing import Optional, List
 from app.config import config
 from app.logger import app_logger
 
+STATS_INTERVAL = 1.0 # Seconds between CPU/RAM samples
+STOP_TIMEOUT = 10.0 # Seconds stop_server waits for a graceful exit
+ZOMBIE_CHECK_INTERVAL = 1.0 # Seconds between psutil status checks of an adopted server without a pidfd
+STARTUP_GRACE = 5.0 # An error exit within this many seconds of start is logged as a failed start
+STDOUT_LIMIT = 1 << 20 # Longer console lines are split
+STDOUT_CHUNK = 64 * 1024 # Bytes per read; a burst of lines is published together
+CONSOLE_BATCH_INTERVAL = 0.02 # Output within this window after a delivery goes out as one item
+CONSOLE_SKIPPED_MARKER = "[SYSTEM] Some console output was skipped, this client fell behind.\n"
+LOG_HISTORY_LINES = 200 # Console lines replayed to new clients
+LOG_HISTORY_BYTES = 256 * 1024 # ...but never more than this, stack traces can be long
+
+def _pid_alive(pid):
+    """Single kill(pid, 0) syscall instead of psutil reading /proc"""
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True # Exists, owned by another user
+
+def _read_usage(p):
+    """(cpu %, rss MB) of a psutil.Process; only reads, safe to run in a thread"""
+    with p.oneshot():
+        return p.cpu_percent(), p.memory_info().rss / 1024 / 1024
+
 class ServerManager:
     def __init__(self):
-        self.process: Optional[subprocess.Popen] = None
-        self.log_history = deque(maxlen=200) # Store last 200 lines for history
-        self.publish_queue = queue.Queue() # Unbounded queue for inter-thread communication
-        self.listeners = [] # WebSocket listeners
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self.log_history = deque() # (raw bytes, newline count) chunks for new clients, see _remember
+        self._history_bytes = 0
+        self._history_lines = 0
+        self.listeners = [] # asyncio.Queues of WebSocket clients, see add_listener
+        self._pending = [] # Output not yet handed to listeners, see publish
+        self._flush_handle = None
+        self._last_flush = 0.0
         self.pid_file = os.path.join(config.get("server_dir"), "server.pid")
         self.external_pid: Optional[int] = None
+        self._stats = {"status": "offline", "cpu": 0, "ram": "0.0 MB"}
+        self._psproc: Optional[psutil.Process] = None # See _proc
+        self._pidfd = None # (fd, poll object) for external_pid, see _watch_external
+        self._zombie_checked = 0.0 # monotonic time of the last psutil status check, see is_running
+        self._launch = None # (config version, launch settings), see _launch_settings
         
         self._check_orphan()
 
     def _check_orphan(self):
         """Check if a server is already running from a previous session"""
-        app_logger.debug(f"Checking for orphaned server process at {self.pid_file}")
-        if config.get("debug_mode"): print(f"[TRACE] _check_orphan: checking {self.pid_file}")
+        app_logger.debug("Checking for orphaned server process at %s", self.pid_file)
         
-        if os.path.exists(self.pid_file):
+        try:
+            fd = os.open(self.pid_file, os.O_RDONLY | os.O_CLOEXEC)
             try:
-                with open(self.pid_file, 'r') as f:
-                    pid = int(f.read().strip())
-                
-                app_logger.info(f"Found PID file with process ID: {pid}")
-                if config.get("debug_mode"): print(f"[TRACE] _check_orphan: PID file found, pid={pid}")
-
-                if psutil.pid_exists(pid):
-                    try:
-                        p = psutil.Process(pid)
-                        # Optional: check if it looks like java/minecraft
-                        if p.status() != psutil.STATUS_ZOMBIE:
-                            app_logger.info(f"Adopting orphaned server process (PID: {pid})")
-                            print(f"[INFO] Found orphaned server process {pid}. Adopting...")
-                            self.external_pid = pid
-                            self.log_history.append(f"[SYSTEM] Reconnected to running server (PID {pid}). Console input not available.")
-                    except Exception as e:
-                        app_logger.warning(f"Error checking orphan process: {e}")
-                        if config.get("debug_mode"): print(f"[TRACE] _check_orphan logic error: {e}")
-                        pass
-                else:
-                    app_logger.info(f"PID {pid} is dead, cleaning up stale PID file")
-                    if config.get("debug_mode"): print(f"[TRACE] _check_orphan: PID {pid} is dead. Cleaning up.")
-                    # Stale PID file
-                    os.remove(self.pid_file)
-            except Exception as e:
-                app_logger.error(f"Error reading PID file: {e}")
-                if config.get("debug_mode"): print(f"[TRACE] _check_orphan: Read error: {e}")
-                pass
+                pid = int(os.read(fd, 32).strip())
+            finally:
+                os.close(fd)
+        except FileNotFoundError:
+            return # No previous session
+        except ValueError:
+            app_logger.warning("PID file is garbled, removing it")
+            self._clean_pid_file()
+            return
+        except Exception as e:
+            app_logger.error(f"Error reading PID file: {e}")
+            return
 
+        app_logger.info(f"Found PID file with process ID: {pid}")
 
-    def start_server(self):
+        try:
+            # One Process lookup covers both "does it exist" and "is it a zombie"
+            p = self._proc(pid)
+            # Optional: check if it looks like java/minecraft
+            if p.status() != psutil.STATUS_ZOMBIE:
+                app_logger.info(f"Adopting orphaned server process (PID: {pid})")
+                self.external_pid = pid
+                self._watch_external(pid)
+                p.cpu_percent(None) # Start the interval the first stats sample measures
+                self._remember(f"[SYSTEM] Reconnected to running server (PID {pid}). Console input not available.\n".encode())
+        except psutil.NoSuchProcess:
+            app_logger.info(f"PID {pid} is dead, cleaning up stale PID file")
+            # Stale PID file
+            self._clean_pid_file()
+        except Exception as e:
+            app_logger.warning(f"Error checking orphan process: {e}")
+
+
+    def _launch_settings(self):
+        """(jar_path, server_dir, java_path, ram_min, ram_max, cmd), rebuilt only
+        when the config changes"""
+        cached = self._launch
+        if cached is None or cached[0] != config.version:
+            # Expand paths (handle ~)
+            jar_path = os.path.expanduser(config.get("jar_path"))
+            server_dir = os.path.expanduser(config.get("server_dir"))
+            java_path = os.path.expanduser(config.get("java_path", "java"))
+            ram_min = config.get("ram_min", "1G")
+            ram_max = config.get("ram_max", "2G")
+            cmd = (
+                java_path,
+                f"-Xms{ram_min}",
+                f"-Xmx{ram_max}",
+                "-jar",
+                jar_path,
+                "nogui"
+            )
+            cached = self._launch = (config.version, (jar_path, server_dir, java_path, ram_min, ram_max, cmd))
+        return cached[1]
+
+    async def start_server(self):
         app_logger.info("=" * 60)
         app_logger.info("SERVER START REQUESTED")
         app_logger.info("=" * 60)
-        if config.get("debug_mode"):
-             app_logger.log(f"[TRACE] start_server called. Current State: {self.is_running()}")
-
         if self.is_running():
             app_logger.warning("Server start aborted: Server is already running")
-            app_logger.log(f"[TRACE] Server already running.")
             return {"status": "error", "message": "Server is already running"}
 
-        # Expand paths (handle ~)
-        jar_path = os.path.expanduser(config.get("jar_path"))
-        server_dir = os.path.expanduser(config.get("server_dir"))
-        java_path = os.path.expanduser(config.get("java_path", "java"))
+        jar_path, server_dir, java_path, ram_min, ram_max, cmd = self._launch_settings()
 
         app_logger.info("Starting Minecraft server...")
         app_logger.info(f"Server JAR:     {jar_path}")
         app_logger.info(f"Server Dir:     {server_dir}")
         app_logger.info(f"Java Path:      {java_path}")
-        app_logger.info(f"RAM Min:        {config.get('ram_min', '1G')}")
-        app_logger.info(f"RAM Max:        {config.get('ram_max', '2G')}")
+        app_logger.info(f"RAM Min:        {ram_min}")
+        app_logger.info(f"RAM Max:        {ram_max}")
 
         if not os.path.exists(jar_path):
              app_logger.error(f"Server JAR not found at {jar_path}")
@@ -88,58 +143,43 @@ class ServerManager:
              app_logger.info(f"Creating server directory: {server_dir}")
              os.makedirs(server_dir, exist_ok=True)
 
-        cmd = [
-            java_path,
-            f"-Xms{config.get('ram_min', '1G')}",
-            f"-Xmx{config.get('ram_max', '2G')}",
-            "-jar",
-            jar_path,
-            "nogui"
-        ]
-        
-        app_logger.debug(f"Executing command: {' '.join(cmd)}")
+        app_logger.debug("Executing command: %s", " ".join(cmd))
 
         try:
-            self.process = subprocess.Popen(
-                cmd,
+            self.process = await asyncio.create_subprocess_exec(
+                *cmd,
                 cwd=server_dir,
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1 # Line buffered
+                limit=STDOUT_LIMIT
             )
+            self._reader_task = asyncio.create_task(self._read_output(self.process))
+            self._prime_cpu(self.process.pid)
             
-            # Save PID
+            # Save PID; a few bytes, no need for a buffered file object. Written
+            # aside and renamed so a crash never leaves a truncated file behind
             self.external_pid = None
+            tmp = self.pid_file + ".tmp"
             try:
-                with open(self.pid_file, 'w') as f:
-                    f.write(str(self.process.pid))
+                fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+                try:
+                    os.write(fd, str(self.process.pid).encode())
+                finally:
+                    os.close(fd)
+                os.replace(tmp, self.pid_file)
                 app_logger.info(f"PID file created: {self.pid_file}")
-            except Exception as e:
+            except OSError as e:
                 app_logger.warning(f"Failed to write PID file: {e}")
 
-            # Immediate post-start verification
+            # An immediate exit is reported by _read_output once stdout closes
             app_logger.info(f"✓ Server process started successfully (PID: {self.process.pid})")
-            
-            # Debug: Check process immediately after start
-            import time
-            time.sleep(0.1)  # Brief pause to let process initialize
-            poll_result = self.process.poll()
-            app_logger.debug(f"Post-start check: poll()={poll_result}, stdout={self.process.stdout is not None}, stdin={self.process.stdin is not None}")
-            
-            if poll_result is not None:
-                app_logger.error(f"Process exited immediately with code: {poll_result}")
-                # Try to read any error output
-                try:
-                    remaining_output = self.process.stdout.read()
-                    if remaining_output:
-                        app_logger.error(f"Process output: {remaining_output}")
-                except:
-                    pass
-            
             app_logger.info("=" * 60)
             return {"status": "success", "message": "Server started"}
+        except FileNotFoundError as e:
+            # Java executable (or the working directory) missing; the exec itself is the check
+            app_logger.error(f"Failed to start server process, not found: {e.filename}")
+            return {"status": "error", "message": f"Not found: {e.filename}"}
         except Exception as e:
             app_logger.error(f"Failed to start server process: {e}")
             return {"status": "error", "message": str(e)}
@@ -148,66 +188,96 @@ class ServerManager:
         app_logger.info("=" * 60)
         app_logger.info("SERVER STOP REQUESTED")
         app_logger.info("=" * 60)
-        if config.get("debug_mode"):
-             print(f"[TRACE] stop_server called.")
 
         if not self.is_running():
             app_logger.warning("Server stop aborted: Server is not running")
-            print(f"[TRACE] stop_server: Server not running.")
             return {"status": "error", "message": "Server is not running"}
         
         app_logger.info("Sending 'stop' command to server...")
-        print(f"[TRACE] stop_server: Sending stop command.")
         self.send_command("stop")
         
         # Wait for graceful shutdown
-        for i in range(20): # Wait up to 10 seconds
-            if not self.is_running():
-                app_logger.info(f"✓ Server stopped gracefully after {i*0.5}s")
-                app_logger.info("=" * 60)
-                print(f"[TRACE] stop_server: Server stopped gracefully after {i*0.5}s.")
-                return {"status": "success", "message": "Server stopped gracefully"}
-            await asyncio.sleep(0.5)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        if await self._wait_exit(STOP_TIMEOUT) and not self.is_running():
+            app_logger.info(f"✓ Server stopped gracefully after {loop.time() - started:.1f}s")
+            app_logger.info("=" * 60)
+            return {"status": "success", "message": "Server stopped gracefully"}
         
-        app_logger.warning("Server did not stop within timeout period (10s)")
-        print(f"[TRACE] stop_server: Timed out waiting for stop.")
+        app_logger.warning(f"Server did not stop within timeout period ({STOP_TIMEOUT:.0f}s)")
         
         # Fallback if external PID and command didn't work (no stdin)
-        if self.external_pid and psutil.pid_exists(self.external_pid):
+        if self.external_pid and _pid_alive(self.external_pid):
              app_logger.warning(f"Cannot stop orphaned server (PID: {self.external_pid}) - no console access")
              return {"status": "warning", "message": "Cannot stop orphaned server gracefully (no console access). Use Kill."}
 
         return {"status": "warning", "message": "Stop command sent, but server is still running. Use Kill if needed."}
 
+    async def _wait_exit(self, timeout):
+        """Waits until the server process exits, waking once on exit instead of
+        polling. Returns False if it is still running after `timeout` seconds."""
+        if self.process:
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+        # Adopted process, not our child: a pidfd becomes readable when it exits
+        owned = self._pidfd is None
+        try:
+            fd = os.pidfd_open(self.external_pid) if owned else self._pidfd[0]
+        except ProcessLookupError:
+            return True
+        except (AttributeError, OSError):
+            # No pidfd (not Linux, or kernel < 5.3), poll instead
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            while self.is_running():
+                if loop.time() >= deadline:
+                    return False
+                await asyncio.sleep(0.5)
+            return True
+
+        loop = asyncio.get_running_loop()
+        exited = loop.create_future()
+        loop.add_reader(fd, lambda: exited.done() or exited.set_result(None))
+        try:
+            await asyncio.wait_for(exited, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(fd)
+            if owned:
+                os.close(fd)
+
     def force_kill(self):
         app_logger.warning("FORCE KILL requested")
-        if config.get("debug_mode"):
-             print(f"[TRACE] force_kill called.")
-             
         pid = self.external_pid
         if self.process:
             pid = self.process.pid
-            self.process.kill()
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass # Exited on its own meanwhile
             self.process = None
+            self._psproc = None
             app_logger.warning(f"Subprocess killed (PID: {pid})")
-            print(f"[TRACE] force_kill: Killed subprocess {pid}.")
         elif self.external_pid:
             try:
                 os.kill(self.external_pid, 9) # SIGKILL
                 app_logger.warning(f"External process killed with SIGKILL (PID: {self.external_pid})")
-                print(f"[TRACE] force_kill: Sigkilled external pid {self.external_pid}.")
             except ProcessLookupError:
                 app_logger.info(f"External process {self.external_pid} already terminated")
-                print(f"[TRACE] force_kill: External pid {self.external_pid} not found (already gone).")
                 pass
             self.external_pid = None
+            self._psproc = None
+            self._unwatch_external()
         
         # Clean PID file
-        if os.path.exists(self.pid_file):
-            try:
-                os.remove(self.pid_file)
-                app_logger.info("PID file cleaned up")
-            except: pass
+        if self._clean_pid_file():
+            app_logger.info("PID file cleaned up")
 
         if pid:
             return {"status": "success", "message": "Process killed"}
@@ -216,167 +286,245 @@ class ServerManager:
 
     def is_running(self):
         if self.process:
-            poll_result = self.process.poll()
-            if config.get("debug_mode"):
-                app_logger.debug(f"is_running check: self.process exists, poll()={poll_result}")
+            poll_result = self.process.returncode
+            app_logger.debug("is_running check: self.process exists, returncode=%s", poll_result)
             if poll_result is None:
                 return True
-            # Clean up if just exited
-            if config.get("debug_mode"):
-                app_logger.debug(f"Process exited with code {poll_result}, cleaning up")
+            # Clean up once; later checks fall through to the cheap "nothing running" path
+            app_logger.debug("Process exited with code %s, cleaning up", poll_result)
+            self.process = None
+            self._psproc = None
             self._clean_pid_file()
             return False
             
         if self.external_pid:
-            if config.get("debug_mode"):
-                app_logger.debug(f"is_running check: external_pid={self.external_pid}")
-            if psutil.pid_exists(self.external_pid):
-                 # Verify it's not a zombie
-                 try:
-                    proc_status = psutil.Process(self.external_pid).status()
-                    if config.get("debug_mode"):
-                        app_logger.debug(f"External process status: {proc_status}")
-                    if proc_status == psutil.STATUS_ZOMBIE:
-                        self.external_pid = None
-                        self._clean_pid_file()
-                        return False
+            app_logger.debug("is_running check: external_pid=%s", self.external_pid)
+            if self._pidfd is not None:
+                # One poll() syscall; the pidfd turns readable once the process has exited
+                if not self._pidfd[1].poll(0):
                     return True
-                 except psutil.NoSuchProcess:
-                    if config.get("debug_mode"):
-                        app_logger.debug(f"External process {self.external_pid} no longer exists")
-                    self.external_pid = None
-                    self._clean_pid_file()
-                    return False
+                app_logger.debug("External process %s has exited", self.external_pid)
+            elif _pid_alive(self.external_pid):
+                # kill(pid, 0) can't tell a zombie apart, ask psutil at most once a second
+                now = time.monotonic()
+                if now - self._zombie_checked < ZOMBIE_CHECK_INTERVAL:
+                    return True
+                self._zombie_checked = now
+                try:
+                    proc_status = self._proc(self.external_pid).status()
+                    app_logger.debug("External process status: %s", proc_status)
+                    if proc_status != psutil.STATUS_ZOMBIE:
+                        return True
+                except psutil.NoSuchProcess:
+                    app_logger.debug("External process %s no longer exists", self.external_pid)
+            else:
+                app_logger.debug("External process %s no longer exists", self.external_pid)
             self.external_pid = None
+            self._unwatch_external()
             self._clean_pid_file()
             return False
             
-        if config.get("debug_mode"):
-            app_logger.debug("is_running check: no process or external_pid")
+        app_logger.debug("is_running check: no process or external_pid")
         return False
         
+    def _watch_external(self, pid):
+        """Opens a pidfd for an adopted process so is_running() can check it without psutil"""
+        try:
+            fd = os.pidfd_open(pid)
+        except (AttributeError, OSError):
+            return # Not Linux >= 5.3, or already gone; is_running falls back to psutil
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        self._pidfd = (fd, poller)
+
+    def _unwatch_external(self):
+        if self._pidfd is not None:
+            os.close(self._pidfd[0])
+            self._pidfd = None
+
+    def _proc(self, pid):
+        """psutil.Process for pid, reused until the pid changes. Besides saving
+        the lookups, cpu_percent() needs the same object between calls."""
+        p = self._psproc
+        if p is None or p.pid != pid:
+            p = self._psproc = psutil.Process(pid)
+        return p
+
+    def _prime_cpu(self, pid):
+        """First cpu_percent() call on a Process returns 0.0; make it now, so the
+        first stats sample already has a real value"""
+        try:
+            self._proc(pid).cpu_percent(None)
+        except psutil.Error:
+            pass
+
     def _clean_pid_file(self):
-        if os.path.exists(self.pid_file):
-            try:
-                os.remove(self.pid_file)
-            except: pass
+        """Removes the PID file; returns True if there was one"""
+        self._psproc = None
+        # One unlink instead of exists() + remove(); a missing file is not an error
+        try:
+            os.unlink(self.pid_file)
+            return True
+        except OSError:
+            return False
 
     def send_command(self, cmd: str):
         if self.process and self.process.stdin:
             try:
                 app_logger.info(f"Sending command to server: {cmd}")
-                if config.get("debug_mode"): print(f"[TRACE] send_command: Writing '{cmd}' to stdin.")
-                self.process.stdin.write(cmd + "\n")
-                self.process.stdin.flush()
+                # Buffered by the transport and written as soon as the pipe accepts it
+                self.process.stdin.write((cmd + "\n").encode())
             except IOError as e:
                 app_logger.error(f"Failed to send command '{cmd}': {e}")
-                if config.get("debug_mode"): print(f"[ERROR] send_command: IOError {e}")
                 pass
         elif self.external_pid:
              app_logger.warning(f"Cannot send command '{cmd}' to orphaned process {self.external_pid}")
-             print(f"[WARN] Cannot send command '{cmd}' to orphaned process {self.external_pid}")
         else:
-             app_logger.debug(f"Command '{cmd}' ignored - no active process")
-             if config.get("debug_mode"): print(f"[TRACE] send_command: Ignored '{cmd}', no process attached.")
+             app_logger.debug("Command '%s' ignored - no active process", cmd)
+
 
+    def add_listener(self, client_queue):
+        """Subscribe an asyncio.Queue; fed from the event loop by _read_output"""
+        self.listeners.append(client_queue)
+
+    def remove_listener(self, client_queue):
+        if client_queue in self.listeners:
+            self.listeners.remove(client_queue)
+
+    async def _read_output(self, process):
+        """Forward the server's stdout to log_history and listeners until it closes"""
+        app_logger.info(f"Server output reader started (PID: {process.pid})")
+        started = time.monotonic()
+        partial = b"" # Incomplete last line of the previous read
+        try:
+            while True:
+                data = await process.stdout.read(STDOUT_CHUNK)
+                if not data:
+                    break
+                if partial:
+                    data = partial + data
+                # Only complete lines; a newline byte never sits inside a UTF-8 sequence
+                end = data.rfind(b"\n") + 1
+                if end == 0 and len(data) > STDOUT_LIMIT:
+                    app_logger.warning("Split an overlong server output line")
+                    end = len(data)
+                partial = data[end:]
+                if end:
+                    app_logger.debug("_read_output: Read %d bytes", end)
+                    self.publish(data[:end])
+            if partial:
+                self.publish(partial)
+            if self._flush_handle is not None:
+                # Don't hold the last lines back once the server has gone quiet for good
+                self._flush_handle.cancel()
+                self._flush_pending()
+            returncode = await process.wait()
+            # Stops and kills end in 0 or a signal, a failed launch (bad jar, JVM flags) in an error code
+            if returncode > 0 and time.monotonic() - started < STARTUP_GRACE:
+                app_logger.error(f"Process exited right after start with code: {returncode}")
+            else:
+                app_logger.info(f"Server output closed, process exited with code {returncode}")
+        except Exception as e:
+            app_logger.error(f"Server output reader exception: {e}")
+
+    def _remember(self, data):
+        """Appends a chunk of raw output to log_history as one entry. The oldest chunks
+        are dropped once the rest still holds LOG_HISTORY_LINES lines, or while
+        over LOG_HISTORY_BYTES; history_text trims to the exact line count."""
+        lines = data.count(b"\n")
+        history = self.log_history
+        history.append((data, lines))
+        self._history_bytes += len(data)
+        self._history_lines += lines
+        while len(history) > 1:
+            old_data, old_lines = history[0]
+            if self._history_lines - old_lines < LOG_HISTORY_LINES and self._history_bytes <= LOG_HISTORY_BYTES:
+                break
+            history.popleft()
+            self._history_bytes -= len(old_data)
+            self._history_lines -= old_lines
+
+    def history_text(self):
+        """The last LOG_HISTORY_LINES lines as one string, so a new client gets
+        them in a single frame"""
+        data = b"".join([chunk for chunk, _ in self.log_history])
+        excess = self._history_lines - LOG_HISTORY_LINES
+        pos = 0
+        for _ in range(excess):
+            pos = data.index(b"\n", pos) + 1
+        # History stays bytes: decoding at most 256 KiB per client connect is cheaper
+        # than decoding every chunk while nobody is watching the console
+        return data[pos:].decode(errors="replace")
+
+    def publish(self, data):
+        """Records one or more lines of raw output and hands them to the listeners
+        as text; runs on the event loop.
+
+        Sparse output is delivered right away. Output arriving within
+        CONSOLE_BATCH_INTERVAL of the last delivery is held and sent as one item."""
+        self._remember(data)
+        if not self.listeners:
+            return
+        self._pending.append(data)
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            delay = self._last_flush + CONSOLE_BATCH_INTERVAL - loop.time()
+            if delay <= 0:
+                self._flush_pending()
+            else:
+                self._flush_handle = loop.call_later(delay, self._flush_pending)
+
+    def _flush_pending(self):
+        self._flush_handle = None
+        self._last_flush = asyncio.get_running_loop().time()
+        text = b"".join(self._pending).decode(errors="replace")
+        self._pending.clear()
+        for q in list(self.listeners):
+            try:
+                q.put_nowait(text)
+            except asyncio.QueueFull:
+                # Slow client: drop its backlog so it catches up with the newest
+                # output, and say so (once per overflow, not once per item)
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(CONSOLE_SKIPPED_MARKER + text)
 
     def get_stats(self):
-        # ALWAYS log - not behind debug mode
-        app_logger.info("get_stats() called")
-        
+        """Latest sample from stats_loop; requests never touch psutil"""
+        return self._stats
+
+    async def _sample_stats(self):
+        pid = self.process.pid if self.process else self.external_pid
         cpu = 0
         ram = 0
         status = "offline"
-        
-        pid = None
-        if self.process:
-            pid = self.process.pid
-            app_logger.info(f"get_stats: Using self.process.pid={pid}")
-        elif self.external_pid:
-            pid = self.external_pid
-            app_logger.info(f"get_stats: Using external_pid={pid}")
-        else:
-            app_logger.info("get_stats: No PID available (no process or external_pid)")
-
-        if pid:
-            is_running_result = self.is_running()
-            app_logger.info(f"get_stats: PID={pid}, is_running()={is_running_result}")
-            
-            if is_running_result:
-                status = "online"
-                try:
-                    pid_exists = psutil.pid_exists(pid)
-                    if config.get("debug_mode"):
-                        app_logger.debug(f"get_stats: psutil.pid_exists({pid})={pid_exists}")
-                    
-                    p = psutil.Process(pid)
-                    with p.oneshot():
-                        cpu = p.cpu_percent()
-                        ram = p.memory_info().rss / 1024 / 1024 # MB
-                    app_logger.debug(f"Stats collected - CPU: {cpu}%, RAM: {ram:.1f}MB")
-                except psutil.NoSuchProcess:
-                    status = "offline"
-                    app_logger.debug("Stats: Process no longer exists (NoSuchProcess)")
-                except Exception as e:
-                    app_logger.error(f"Failed to collect stats: {e}")
-                    print(f"[ERROR] get_stats failed: {e}")
-                    pass
-        
-        result = {
+        if pid and self.is_running():
+            status = "online"
+            try:
+                # cpu_percent() measures since the previous call on the same Process object
+                p = self._proc(pid)
+                # The /proc reads happen in a worker thread so they never stall the loop
+                cpu, ram = await asyncio.to_thread(_read_usage, p)
+                app_logger.debug("Stats collected - CPU: %s%%, RAM: %.1fMB", cpu, ram)
+            except psutil.NoSuchProcess:
+                status = "offline"
+                self._psproc = None
+                app_logger.debug("Stats: Process no longer exists (NoSuchProcess)")
+            except Exception as e:
+                app_logger.error(f"Failed to collect stats: {e}")
+        self._stats = {
             "status": status,
             "cpu": cpu,
             "ram": f"{ram:.1f} MB"
         }
-        app_logger.info(f"get_stats() returning: {result}")
-        return result
-
-# For simple reading of stdout without blocking the async loop, 
-# we can use a Thread to update the queue.
-import threading
-import time
 
-def reader_thread(server_manager):
-    app_logger.info("Server output reader thread started")
-    app_logger.log(f"[TRACE] reader_thread: Started.")
-    last_process_state = None
-    
-    while True:
-        try:
-            has_process = server_manager.process is not None
-            has_stdout = server_manager.process.stdout if has_process else None
-            
-            # Log state changes
-            current_state = (has_process, has_stdout is not None)
-            if current_state != last_process_state:
-                if config.get("debug_mode"):
-                    app_logger.debug(f"reader_thread state change: process={has_process}, stdout={has_stdout is not None}")
-                last_process_state = current_state
-            
-            if server_manager.process and server_manager.process.stdout:
-                line = server_manager.process.stdout.readline()
-                if line:
-                    if config.get("debug_mode"):
-                        app_logger.debug(f"reader_thread: Read line: {line.strip()[:100]}...")  # Log first 100 chars
-                    server_manager.log_history.append(line)
-                    server_manager.publish_queue.put(line)
-                else:
-                    if config.get("debug_mode"): 
-                        poll_result = server_manager.process.poll()
-                        app_logger.debug(f"reader_thread: Empty line, poll()={poll_result}")
-                    # Process ended or stream closed
-                    if not server_manager.is_running():
-                         time.sleep(1)
-            else:
-                # No process running
-                time.sleep(1)
-        except Exception as e:
-             app_logger.error(f"Reader thread exception: {e}")
-             if config.get("debug_mode"): app_logger.log(f"[ERROR] reader_thread exception: {e}")
-             # Prevent thread crash on IO errors
-             time.sleep(1)
+    async def stats_loop(self):
+        """Samples CPU/RAM every STATS_INTERVAL, independent of how often clients poll"""
+        while True:
+            try:
+                await self._sample_stats()
+            except Exception as e:
+                app_logger.error(f"Stats loop error: {e}")
+            await asyncio.sleep(STATS_INTERVAL)
 
 server_manager = ServerManager()
-
-# Start the reading thread
-t = threading.Thread(target=reader_thread, args=(server_manager,), daemon=True)
-t.start()
@@ -31,7 +31,7 @@ source venv/bin/activate
 
 # 3. Install Python libs
 echo -e "${GREEN}>>> Installing Python libraries...${NC}"
-pip install fastapi uvicorn psutil python-multipart python-jose[cryptography] jinja2 requests websockets
+pip install fastapi uvicorn psutil python-multipart pyjwt jinja2 requests websockets deflate orjson
 
 # 4. Create dummy config if not exists
 if [ ! -f "config.json" ]; then